@@ -1,11 +1,17 @@
 import os
+from functools import lru_cache
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine
 from sqlalchemy.engine import Engine
 
 
+@lru_cache(maxsize=1)
 def build_engine_from_env() -> Engine:
+    """
+    Built once per process: repeat calls return the same Engine (and its pool)
+    without re-reading .env.
+    """
     load_dotenv()
 
     host = os.getenv("DB_HOST")
@@ -14,17 +20,37 @@ def build_engine_from_env() -> Engine:
     user = os.getenv("DB_USER")
     pwd = os.getenv("DB_PASSWORD")
 
-    missing = [k for k, v in {
-        "DB_HOST": host,
-        "DB_PORT": port,
-        "DB_NAME": name,
-        "DB_USER": user,
-        "DB_PASSWORD": pwd,
-    }.items() if not v]
+    missing = []
+    for k, v in (
+        ("DB_HOST", host),
+        ("DB_PORT", port),
+        ("DB_NAME", name),
+        ("DB_USER", user),
+        ("DB_PASSWORD", pwd),
+    ):
+        if not v:
+            missing.append(k)
 
     if missing:
         raise RuntimeError(f"Missing required .env keys: {', '.join(missing)}")
 
     # SQLAlchemy 2.0 + psycopg3 driver
-    url = f"postgresql+psycopg://{user}:{pwd}@{host}:{port}/{name}"
-    return create_engine(url, future=True, pool_pre_ping=True)
\ No newline at end of file
+    # prepare_threshold=1: server-side prepare repeated statements from the first reuse
+    # The importer checks out one connection per run, so skip the pre-ping round-trip
+    # and recycle idle connections instead.
+    # URL.create escapes special characters (e.g. "@") in the password
+    url = URL.create(
+        "postgresql+psycopg",
+        username=user,
+        password=pwd,
+        host=host,
+        port=int(port),
+        database=name,
+    )
+    return create_engine(
+        url,
+        future=True,
+        pool_pre_ping=False,
+        pool_recycle=60,
+        connect_args={"prepare_threshold": 1},
+    )
@@ -0,0 +1,21 @@
+-- Indexes backing the importer's lookups (see db/queries.py).
+-- Safe to re-run. Apply with:
+--   psql -h <host> -p <port> -U <user> -d <db> -f db/migrations/001_tournament_results_indexes.sql
+
+-- SQL_PREV_WITHIN_GAP / SQL_NEXT_WITHIN_GAP / SQL_SESSION_ROWS:
+-- site + start time, walked backwards for PREV and forwards for NEXT.
+-- INCLUDE makes them index-only scans (no heap fetch for the session columns).
+CREATE INDEX IF NOT EXISTS ix_tournament_results_site_start
+    ON tournament_results (site, tournament_start_ts_local)
+    INCLUDE (session_id, session_start_ts_local);
+
+-- SQL_COUNT_BEFORE_IN_SESSION / SQL_BUMP_INDICES_AT_OR_AFTER_TS /
+-- SQL_MIN_SESSION_START / SQL_SHIFT_SESSION_INDICES
+CREATE INDEX IF NOT EXISTS ix_tournament_results_site_session_start
+    ON tournament_results (site, session_id, tournament_start_ts_local);
+
+-- SQL_HASH_EXISTS / SQL_EXISTING_HASHES: single-row lookups.
+-- Also lets the database reject a re-imported file (surfaces as unique_conflict).
+-- Fails if the table already holds duplicate hashes; clean those up first.
+CREATE UNIQUE INDEX IF NOT EXISTS ux_tournament_results_source_file_hash
+    ON tournament_results (source_file_hash);
@@ -1,6 +1,12 @@
 # Central place for SQL text blocks so they don't get duplicated across modules.
 # Keep it boring and explicit.
+#
+# Lookups below expect the indexes in db/migrations/001_tournament_results_indexes.sql:
+#   ux_tournament_results_source_file_hash   (source_file_hash)                        UNIQUE
+#   ix_tournament_results_site_start         (site, tournament_start_ts_local) INCLUDE (session_id, session_start_ts_local)
+#   ix_tournament_results_site_session_start (site, session_id, tournament_start_ts_local)
 
+# ux_tournament_results_source_file_hash
 SQL_HASH_EXISTS = """
 SELECT 1
 FROM tournament_results
@@ -8,6 +14,13 @@ WHERE source_file_hash = :file_hash
 LIMIT 1
 """
 
+# ux_tournament_results_source_file_hash
+SQL_EXISTING_HASHES = """
+SELECT source_file_hash
+FROM tournament_results
+WHERE source_file_hash = ANY(:file_hashes)
+"""
+
 SQL_INSERT_TOURNAMENT = """
 INSERT INTO tournament_results (
     site, tournament_id, tournament_start_ts_local, hero_name,
@@ -24,10 +37,42 @@ INSERT INTO tournament_results (
     :buy_in_amount, :prize_pool_amount, :payout_amount, :profit_amount,
     :finish_place,
     :session_id, :session_start_ts_local, :session_tournament_index,
-    now(), NULL, NULL
+    now(), CASE WHEN CAST(:notes AS text) IS NULL THEN NULL ELSE now() END, :notes
+)
+"""
+
+# Bulk path: same columns as SQL_INSERT_TOURNAMENT, fed by psycopg3's COPY protocol.
+# Rows are tuples in TOURNAMENT_PARAM_KEYS order: the ParsedTournament fields first
+# (so a single attrgetter can produce them), then per-file / session values, then notes.
+# COPY rows append imported_at and modified_at.
+TOURNAMENT_PARAM_KEYS = (
+    "site", "tournament_id", "start_ts", "hero_name",
+    "tournament_name", "game_type", "player_count", "currency",
+    "buy_in_amount", "prize_pool_amount", "payout_amount", "profit_amount",
+    "finish_place",
+    "source_file_name", "source_file_hash",
+    "session_id", "session_start_ts_local", "session_tournament_index",
+    "notes",
 )
+
+SQL_COPY_TOURNAMENTS = """
+COPY tournament_results (
+    site, tournament_id, tournament_start_ts_local, hero_name,
+    tournament_name, game_type, player_count, currency,
+    buy_in_amount, prize_pool_amount, payout_amount, profit_amount,
+    finish_place,
+    source_file_name, source_file_hash,
+    session_id, session_start_ts_local, session_tournament_index,
+    notes,
+    imported_at, modified_at
+) FROM STDIN
+"""
+
+SQL_NOW = """
+SELECT now()
 """
 
+# ix_tournament_results_site_start (index-only, backward scan)
 SQL_PREV_WITHIN_GAP = """
 SELECT session_id, session_start_ts_local, tournament_start_ts_local
 FROM tournament_results
@@ -38,6 +83,7 @@ ORDER BY tournament_start_ts_local DESC
 LIMIT 1
 """
 
+# ix_tournament_results_site_start (index-only, forward scan)
 SQL_NEXT_WITHIN_GAP = """
 SELECT session_id, session_start_ts_local, tournament_start_ts_local
 FROM tournament_results
@@ -48,6 +94,7 @@ ORDER BY tournament_start_ts_local ASC
 LIMIT 1
 """
 
+# ix_tournament_results_site_session_start
 SQL_COUNT_BEFORE_IN_SESSION = """
 SELECT COUNT(*) AS c
 FROM tournament_results
@@ -56,6 +103,7 @@ WHERE site = :site
   AND tournament_start_ts_local < :ts
 """
 
+# ix_tournament_results_site_session_start
 SQL_BUMP_INDICES_AT_OR_AFTER_TS = """
 UPDATE tournament_results
 SET session_tournament_index = session_tournament_index + 1,
@@ -69,8 +117,34 @@ WHERE site = :site
   AND tournament_start_ts_local >= :ts
 """
 
+# ix_tournament_results_site_session_start
 SQL_MIN_SESSION_START = """
 SELECT MIN(tournament_start_ts_local) AS min_ts
 FROM tournament_results
 WHERE site = :site AND session_id = :session_id
 """
+
+# In-memory session assignment (importer.session_assigner.SessionIndex)
+
+# ix_tournament_results_site_start (index-only)
+SQL_SESSION_ROWS = """
+SELECT session_id, session_start_ts_local, tournament_start_ts_local
+FROM tournament_results
+WHERE site = :site
+ORDER BY tournament_start_ts_local ASC
+"""
+
+# Applies `shift` SQL_BUMP_INDICES_AT_OR_AFTER_TS bumps at once to the rows at one timestamp.
+# ix_tournament_results_site_session_start
+SQL_SHIFT_SESSION_INDICES = """
+UPDATE tournament_results
+SET session_tournament_index = session_tournament_index + :shift,
+    modified_at = now(),
+    notes = CASE
+        WHEN notes IS NULL OR notes = '' THEN 'index_shifted' || repeat(' | index_shifted', :shift - 1)
+        ELSE notes || repeat(' | index_shifted', :shift)
+    END
+WHERE site = :site
+  AND session_id = :session_id
+  AND tournament_start_ts_local = :ts
+"""
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import json
+import errno
+import os
+import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, List, Optional
 
+import orjson
 import shutil
 
 
@@ -25,34 +28,76 @@ def ensure_dirs(folders: FolderConfig) -> None:
     folders.logs_dir.mkdir(parents=True, exist_ok=True)
 
 
+def _move_file(src: Path, dest: Path) -> None:
+    try:
+        # Same filesystem: a single rename. os.rename (not os.replace) so Windows
+        # raises FileExistsError instead of overwriting a file that appeared meanwhile
+        os.rename(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Cross-filesystem: shutil copies (sendfile / copy_file_range) then unlinks src
+        shutil.move(str(src), str(dest))
+
+
 def safe_move_with_suffix(src: Path, dest_dir: Path) -> Path:
     """
-    Move src into dest_dir.
-    If a file name already exists, append a timestamp suffix.
+    Move src into dest_dir (created up front by ensure_dirs).
+    If a file name already exists, append a timestamp + random suffix.
     """
-    dest_dir.mkdir(parents=True, exist_ok=True)
     dest = dest_dir / src.name
+    ts = None
 
-    if not dest.exists():
-        shutil.move(str(src), str(dest))
-        return dest
-
-    stem = src.stem
-    suffix = src.suffix
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    candidate = dest_dir / f"{stem}_{ts}{suffix}"
-    counter = 1
-    while candidate.exists():
-        candidate = dest_dir / f"{stem}_{ts}_{counter}{suffix}"
-        counter += 1
-
-    shutil.move(str(src), str(candidate))
-    return candidate
-
-
-def log_jsonl(log_path: Path, payload: Dict[str, Any]) -> None:
-    payload = dict(payload)
-    payload["timestamp"] = datetime.now().isoformat(timespec="seconds")
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    with log_path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    while True:
+        if not os.path.lexists(dest):
+            try:
+                _move_file(src, dest)
+                return dest
+            except FileExistsError:
+                # Taken between the check and the move; pick another name
+                pass
+        # Random tag: a second collision is practically impossible, so this loops once
+        ts = ts or datetime.now().strftime("%Y%m%d_%H%M%S")
+        dest = dest_dir / f"{src.stem}_{ts}_{uuid.uuid4().hex[:6]}{src.suffix}"
+
+
+class JsonlLogger:
+    """
+    Appends JSON Lines to log_path, keeping the file open for the whole run.
+    Records are buffered and written every `flush_every` events and on close.
+    """
+
+    def __init__(self, log_path: Path, flush_every: int = 100) -> None:
+        self.log_path = log_path
+        self.flush_every = flush_every
+        self._buffer: List[bytes] = []
+        self._fh: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "JsonlLogger":
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.log_path.open("ab", buffering=1 << 16)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, payload: Dict[str, Any]) -> None:
+        payload = dict(payload)
+        payload["timestamp"] = datetime.now()
+        # orjson emits UTF-8 bytes and formats the datetime itself (ISO, seconds precision)
+        self._buffer.append(orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_OMIT_MICROSECONDS))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._fh.writelines(self._buffer)
+            self._buffer.clear()
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.flush()
+        self._fh.close()
+        self._fh = None
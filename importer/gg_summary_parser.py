@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Tuple
 
+from utils.text_utils import decode_with_fallback
+
 
 @dataclass(frozen=True)
 class ParsedTournament:
@@ -25,97 +27,126 @@ class ParsedTournament:
     finish_place: Optional[int]
 
 
-def parse_money_usd(token: str) -> Optional[float]:
+# Compiled once; parse_money_usd runs for every buy-in/pool/payout token.
+_MONEY_RE = re.compile(rb"\A\d+(?:\.\d+)?\Z")
+
+
+def parse_money_usd(token: bytes) -> Optional[float]:
     """
-    Accepts: "$3", "$3.00", "$1,200.50"
+    Accepts: b"$3", b"$3.00", b"$1,200.50"
     Returns float or None if not a cash $ amount.
     """
     token = token.strip()
-    if not token.startswith("$"):
+    if not token.startswith(b"$"):
         return None
-    number_part = token[1:].replace(",", "").strip()
-    if not re.fullmatch(r"\d+(\.\d+)?", number_part):
+    number_part = token[1:].replace(b",", b"").strip()
+    if not _MONEY_RE.match(number_part):
         return None
     return float(number_part)
 
 
+# Single-occurrence summary lines, one named branch each (group names must be unique
+# across branches). Fused into GGSummaryParser.RE_FIELDS so the text is scanned once.
+# Patterns are bytes: the parser runs on the raw file and only decodes the text fields it keeps.
+_FIELD_PATTERNS = (
+    ("header", rb"^\s*Tournament\s*#(?P<tid>\d+)\s*,\s*(?P<tname>.+?)\s*,\s*(?P<gtype>.+?)\s*$"),
+    ("buy_in", rb"^\s*Buy-in:\s*(?P<buy_amt>\$[0-9,]+(?:\.[0-9]+)?)\s*$"),
+    ("players", rb"^\s*(?P<n>\d+)\s+Players\s*$"),
+    ("pool", rb"^\s*Total\s+Prize\s+Pool:\s*(?P<pool_amt>\$[0-9,]+(?:\.[0-9]+)?)\s*$"),
+    (
+        "started",
+        rb"^\s*Tournament\s+started\s+"
+        rb"(?P<yr>\d{4})/(?P<mon>\d{2})/(?P<day>\d{2})\s+(?P<hr>\d{2}):(?P<mi>\d{2}):(?P<sec>\d{2})\s*$",
+    ),
+    ("finish", rb"^\s*You\s+finished\s+in\s+(?P<place>\d+)\s+place\.\s*$"),
+)
+
+
 class GGSummaryParser:
-    RE_TOURNAMENT_LINE = re.compile(
-        r"^\s*Tournament\s*#(?P<tid>\d+)\s*,\s*(?P<tname>.+?)\s*,\s*(?P<gtype>.+?)\s*$",
-        re.IGNORECASE | re.MULTILINE,
-    )
-    RE_BUYIN = re.compile(
-        r"^\s*Buy-in:\s*(?P<amt>\$[0-9,]+(?:\.[0-9]+)?)\s*$",
-        re.IGNORECASE | re.MULTILINE,
-    )
-    RE_PLAYERS = re.compile(r"^\s*(?P<n>\d+)\s+Players\s*$", re.IGNORECASE | re.MULTILINE)
-    RE_POOL = re.compile(
-        r"^\s*Total\s+Prize\s+Pool:\s*(?P<amt>\$[0-9,]+(?:\.[0-9]+)?)\s*$",
-        re.IGNORECASE | re.MULTILINE,
-    )
-    RE_STARTED = re.compile(
-        r"^\s*Tournament\s+started\s+(?P<dt>\d{4}/\d{2}/\d{2}\s+\d{2}:\d{2}:\d{2})\s*$",
-        re.IGNORECASE | re.MULTILINE,
-    )
-    RE_FINISH = re.compile(
-        r"^\s*You\s+finished\s+in\s+(?P<place>\d+)\s+place\.\s*$",
+    # Match.lastgroup names the branch that matched
+    RE_FIELDS = re.compile(
+        b"|".join(b"(?P<%s>%s)" % (key.encode(), pattern) for key, pattern in _FIELD_PATTERNS),
         re.IGNORECASE | re.MULTILINE,
     )
     RE_PLACEMENT_LINE = re.compile(
-        r"^\s*(?P<place>\d+)(?:st|nd|rd|th)\s*:\s*(?P<name>.+?)\s*,\s*(?P<payout>.+?)\s*$",
+        rb"^\s*(?P<place>\d+)(?:st|nd|rd|th)\s*:\s*(?P<name>.+?)\s*,\s*(?P<payout>.+?)\s*$",
         re.IGNORECASE | re.MULTILINE,
     )
 
-    def parse(self, site: str, text: str) -> Tuple[Optional[ParsedTournament], Optional[str]]:
+    def _find_placement(self, data: bytes, name: bytes) -> Optional[re.Match]:
+        """
+        First placement line for `name` (case-insensitive), or None.
+        Jumps to lines containing the name with bytes.find on a lowercased copy and
+        only runs the regex there, so lines are still tried in document order.
+        """
+        key = name.lower()
+        low = data.lower()
+
+        i = low.find(key)
+        while i >= 0:
+            start = data.rfind(b"\n", 0, i) + 1
+            end = data.find(b"\n", i)
+            if end < 0:
+                end = len(data)
+            pm = self.RE_PLACEMENT_LINE.match(data, start, end)
+            if pm and pm.group("name").strip().lower() == key:
+                return pm
+            i = low.find(key, end)
+        return None
+
+    def parse(self, site: str, data: bytes) -> Tuple[Optional[ParsedTournament], Optional[str]]:
         """
+        Parses the raw bytes of a summary file.
         Returns (ParsedTournament or None, reason_if_none).
         Reasons starting with:
           - "needs_review:" route to Needs Review
           - "parse_error:" route to Needs Review as well (but logged as error)
         """
-        m = self.RE_TOURNAMENT_LINE.search(text)
+        # First occurrence of each line wins (same as a per-pattern search)
+        found = {}
+        for fm in self.RE_FIELDS.finditer(data):
+            found.setdefault(fm.lastgroup, fm)
+
+        m = found.get("header")
         if not m:
             return None, "parse_error:missing_tournament_header"
 
         tournament_id = int(m.group("tid"))
-        tournament_name = m.group("tname").strip()
-        game_type = m.group("gtype").strip()
+        tournament_name = decode_with_fallback(m.group("tname")).strip()
+        game_type = decode_with_fallback(m.group("gtype")).strip()
 
-        m_buy = self.RE_BUYIN.search(text)
+        m_buy = found.get("buy_in")
         if not m_buy:
             return None, "parse_error:missing_buy_in"
-        buy_in = parse_money_usd(m_buy.group("amt"))
+        buy_in = parse_money_usd(m_buy.group("buy_amt"))
         if buy_in is None:
             return None, "needs_review:non_cash_buy_in"
 
-        m_p = self.RE_PLAYERS.search(text)
+        m_p = found.get("players")
         player_count = int(m_p.group("n")) if m_p else None
 
-        m_pool = self.RE_POOL.search(text)
-        prize_pool = parse_money_usd(m_pool.group("amt")) if m_pool else None
+        m_pool = found.get("pool")
+        prize_pool = parse_money_usd(m_pool.group("pool_amt")) if m_pool else None
 
-        m_s = self.RE_STARTED.search(text)
+        m_s = found.get("started")
         if not m_s:
             return None, "parse_error:missing_start_time"
-        start_dt = datetime.strptime(m_s.group("dt"), "%Y/%m/%d %H:%M:%S")
+        # Fixed layout, so build the datetime directly (strptime is the slow path)
+        start_dt = datetime(*map(int, m_s.group("yr", "mon", "day", "hr", "mi", "sec")))
 
-        m_f = self.RE_FINISH.search(text)
+        m_f = found.get("finish")
         finish_place = int(m_f.group("place")) if m_f else None
 
         hero_name = "Hero"
-        payout_amount: Optional[float] = None
 
-        for pm in self.RE_PLACEMENT_LINE.finditer(text):
-            name = pm.group("name").strip()
-            if name.lower() == hero_name.lower():
-                payout_token = pm.group("payout").strip()
-                payout_amount = parse_money_usd(payout_token)
-                if payout_amount is None:
-                    return None, "needs_review:non_cash_payout"
-                break
+        pm = self._find_placement(data, hero_name.encode())
+        if pm is None:
+            return None, "parse_error:missing_hero_payout_line"
 
+        payout_token = pm.group("payout").strip()
+        payout_amount = parse_money_usd(payout_token)
         if payout_amount is None:
-            return None, "parse_error:missing_hero_payout_line"
+            return None, "needs_review:non_cash_payout"
 
         profit_amount = round(payout_amount - buy_in, 2)
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import uuid
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from sqlalchemy import text
 from db import queries as q
@@ -75,3 +76,149 @@ def ensure_session_and_index(
 
     session_start = min_start if min_start else session_start
     return session_id, session_start, new_index
+
+
+def shift_notes(shifts: int) -> Optional[str]:
+    """
+    Notes value SQL_BUMP_INDICES_AT_OR_AFTER_TS leaves on a fresh row after `shifts` bumps.
+    """
+    if not shifts:
+        return None
+    return " | ".join(["index_shifted"] * shifts)
+
+
+class SessionRow:
+    __slots__ = ("ts", "session_id", "session_start", "shifts", "persisted")
+
+    def __init__(
+        self,
+        ts: datetime,
+        session_id: Optional[str],
+        session_start: Optional[datetime],
+        persisted: bool,
+    ) -> None:
+        self.ts = ts
+        self.session_id = session_id
+        self.session_start = session_start
+        self.shifts = 0            # index bumps not yet written to the table
+        self.persisted = persisted
+
+
+class SessionIndex:
+    """
+    In-memory copy of one site's session layout, loaded once per run.
+
+    assign() gives the same answer as ensure_session_and_index() without any
+    queries. Index bumps are counted on the affected rows instead of being
+    written: new rows fold them into their INSERT, rows already in the table
+    are updated from shifted_rows(). Call mark_flushed() after the commit.
+    """
+
+    def __init__(self, site: str, gap_minutes: int) -> None:
+        self.site = site
+        self.gap = timedelta(minutes=gap_minutes)
+        self._ts: List[datetime] = []              # every row for the site, sorted
+        self._rows: List[SessionRow] = []          # parallel to _ts
+        self._sessions: Dict[str, Tuple[List[datetime], List[SessionRow]]] = {}
+        self._shifted: Set[SessionRow] = set()
+        self._new: List[SessionRow] = []
+
+    def reload(self, conn) -> None:
+        """
+        Rebuild from the table (after a rollback the in-memory state is stale).
+        """
+        self._ts = []
+        self._rows = []
+        self._sessions = {}
+        self._shifted = set()
+        self._new = []
+
+        rows = conn.execute(text(q.SQL_SESSION_ROWS), {"site": self.site})
+        for r in rows:
+            session_id = str(r.session_id) if r.session_id else None
+            row = SessionRow(r.tournament_start_ts_local, session_id, r.session_start_ts_local, persisted=True)
+            self._ts.append(row.ts)
+            self._rows.append(row)
+            if session_id:
+                ts_list, members = self._sessions.setdefault(session_id, ([], []))
+                ts_list.append(row.ts)
+                members.append(row)
+
+    def _find_within_gap(self, ts_local: datetime) -> Tuple[Optional[str], Optional[datetime]]:
+        # SQL_PREV_WITHIN_GAP
+        i = bisect_right(self._ts, ts_local) - 1
+        if i >= 0 and ts_local - self._ts[i] <= self.gap:
+            prev = self._rows[i]
+            if prev.session_id:
+                return prev.session_id, prev.session_start
+
+        # SQL_NEXT_WITHIN_GAP
+        j = bisect_left(self._ts, ts_local)
+        if j < len(self._ts) and self._ts[j] - ts_local <= self.gap:
+            nxt = self._rows[j]
+            if nxt.session_id:
+                return nxt.session_id, nxt.session_start
+
+        return None, None
+
+    def assign(self, ts_local: datetime) -> Tuple[str, datetime, int, SessionRow]:
+        """
+        Returns:
+          (session_id, session_start_ts_local, session_tournament_index, row)
+
+        Same rules as ensure_session_and_index(); `row` tracks later bumps to
+        the new tournament's index until it is flushed.
+        """
+        session_id, session_start = self._find_within_gap(ts_local)
+
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+            session_start = ts_local
+            ts_list, members = self._sessions.setdefault(session_id, ([], []))
+            pos = 0
+        else:
+            ts_list, members = self._sessions[session_id]
+            # Index position = count of session rows strictly before ts
+            pos = bisect_left(ts_list, ts_local)
+
+            # Bump existing indices that occur at/after this timestamp in the same session
+            for m in members[pos:]:
+                m.shifts += 1
+                self._shifted.add(m)
+
+            # Session start should be the earliest tournament in that session
+            session_start = ts_list[0] if ts_list else session_start
+
+        row = SessionRow(ts_local, session_id, session_start, persisted=False)
+        ts_list.insert(pos, ts_local)
+        members.insert(pos, row)
+
+        i = bisect_right(self._ts, ts_local)
+        self._ts.insert(i, ts_local)
+        self._rows.insert(i, row)
+        self._new.append(row)
+
+        return session_id, session_start, pos + 1, row
+
+    def shifted_rows(self) -> List[Dict[str, Any]]:
+        """
+        SQL_SHIFT_SESSION_INDICES params for table rows bumped since the last flush.
+        Must run before the new rows are inserted.
+        """
+        # Table rows sharing (session_id, ts) always have the same shift count
+        groups: Dict[Tuple[str, datetime], int] = {}
+        for r in self._shifted:
+            if r.persisted and r.shifts:
+                groups[(r.session_id, r.ts)] = r.shifts
+        return [
+            {"site": self.site, "session_id": session_id, "ts": ts, "shift": shift}
+            for (session_id, ts), shift in groups.items()
+        ]
+
+    def mark_flushed(self) -> None:
+        for r in self._shifted:
+            r.shifts = 0
+        for r in self._new:
+            r.persisted = True
+        self._shifted.clear()
+        self._new.clear()
@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+import operator
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import psycopg
 import yaml
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 
 from db import queries as q
-from importer.file_router import FolderConfig, ensure_dirs, safe_move_with_suffix, log_jsonl
-from importer.gg_summary_parser import GGSummaryParser
-from importer.session_assigner import ensure_session_and_index
-from utils.hashing import sha256_file
-from utils.text_utils import read_text_with_fallback
+from importer.file_router import FolderConfig, ensure_dirs, safe_move_with_suffix, JsonlLogger
+from importer.gg_summary_parser import GGSummaryParser, ParsedTournament
+from importer.session_assigner import SessionIndex, SessionRow, ensure_session_and_index, shift_notes
+from utils.hashing import sha256_bytes
 
 
 @dataclass(frozen=True)
@@ -71,7 +78,69 @@ def build_import_config(config_path: Path) -> ImportConfig:
     )
 
 
+@lru_cache(maxsize=None)
+def _driver_sql(dialect, sql: str) -> str:
+    """
+    Render a :name-style SQL block in the driver's paramstyle (psycopg: %(name)s)
+    for use on a raw DBAPI cursor.
+    """
+    return str(text(sql).compile(dialect=dialect))
+
+
+# ParsedTournament -> leading fields of an insert row (TOURNAMENT_PARAM_KEYS order),
+# as one C-level call instead of per-field attribute lookups.
+_PARSED_FIELDS = operator.attrgetter(
+    "site", "tournament_id", "tournament_start_ts_local", "hero_name",
+    "tournament_name", "game_type", "player_count", "currency",
+    "buy_in_amount", "prize_pool_amount", "payout_amount", "profit_amount",
+    "finish_place",
+)
+
+
+def _insert_row(
+    parsed: ParsedTournament,
+    path: Path,
+    file_hash: str,
+    session_id: str,
+    session_start: datetime,
+    session_index: int,
+    notes: Optional[str] = None,
+) -> Tuple[Any, ...]:
+    """
+    Insert values in q.TOURNAMENT_PARAM_KEYS order.
+    """
+    return _PARSED_FIELDS(parsed) + (path.name, file_hash, session_id, session_start, session_index, notes)
+
+
+@dataclass(frozen=True)
+class _PendingRow:
+    path: Path
+    event: Dict[str, Any]
+    parsed: ParsedTournament
+    file_hash: str
+    session_index: int
+    session_row: SessionRow
+
+    def insert_row(self) -> Tuple[Any, ...]:
+        # Fold in index bumps from rows assigned after this one was queued
+        shifts = self.session_row.shifts
+        return _insert_row(
+            self.parsed,
+            self.path,
+            self.file_hash,
+            self.session_row.session_id,
+            self.session_row.session_start,
+            self.session_index + shifts,
+            shift_notes(shifts),
+        )
+
+
 class TournamentImporter:
+    # Max rows written per COPY / transaction
+    BATCH_SIZE = 500
+    # Smaller batches are pipelined INSERTs; COPY's setup isn't worth it below this
+    COPY_MIN_ROWS = 100
+
     def __init__(self, cfg: ImportConfig, engine) -> None:
         self.cfg = cfg
         self.engine = engine
@@ -81,6 +150,193 @@ class TournamentImporter:
         row = conn.execute(text(q.SQL_HASH_EXISTS), {"file_hash": file_hash}).fetchone()
         return row is not None
 
+    def _existing_hashes(self, conn, file_hashes: List[str]) -> Set[str]:
+        if not file_hashes:
+            return set()
+        rows = conn.execute(text(q.SQL_EXISTING_HASHES), {"file_hashes": file_hashes})
+        return {r.source_file_hash for r in rows}
+
+    def _flush_batch(self, conn, rows: List[Tuple[Any, ...]], shifted: List[Dict[str, Any]]) -> None:
+        """
+        Apply session index shifts, then write rows, on the caller's open transaction.
+
+        psycopg3: shifts and small batches are sent in pipeline mode (one sync for
+        all of them); batches of COPY_MIN_ROWS or more are written with COPY.
+        Other drivers: plain executemany.
+        """
+        if conn.dialect.driver != "psycopg":
+            if shifted:
+                conn.execute(text(q.SQL_SHIFT_SESSION_INDICES), shifted)
+            if rows:
+                conn.execute(text(q.SQL_INSERT_TOURNAMENT), [dict(zip(q.TOURNAMENT_PARAM_KEYS, r)) for r in rows])
+            return
+
+        pg_conn = conn.connection.driver_connection
+        use_copy = len(rows) >= self.COPY_MIN_ROWS
+
+        with pg_conn.cursor() as cur:
+            # Pipeline mode needs libpq 14+; executemany still works without it
+            with pg_conn.pipeline() if psycopg.Pipeline.is_supported() else nullcontext():
+                if shifted:
+                    cur.executemany(_driver_sql(conn.dialect, q.SQL_SHIFT_SESSION_INDICES), shifted)
+                if rows and not use_copy:
+                    cur.executemany(
+                        _driver_sql(conn.dialect, q.SQL_INSERT_TOURNAMENT),
+                        [dict(zip(q.TOURNAMENT_PARAM_KEYS, r)) for r in rows],
+                    )
+
+            if not use_copy:
+                return
+
+            imported_at = cur.execute(q.SQL_NOW).fetchone()[0]
+            with cur.copy(q.SQL_COPY_TOURNAMENTS) as cp:
+                for r in rows:
+                    # r[-1] is notes: only rows bumped before their insert count as modified
+                    cp.write_row(r + (imported_at, imported_at if r[-1] is not None else None))
+
+    def _commit_pending(
+        self,
+        conn,
+        pending: List[_PendingRow],
+        sessions: SessionIndex,
+        counts: Dict[str, int],
+        log: JsonlLogger,
+    ) -> Set[str]:
+        """
+        Write the session index bumps and queued rows as one batch, move their
+        files to Processed, then commit.
+        If anything fails, roll back, put moved files back, and retry row by row
+        so one bad file doesn't take the rest of the batch with it. Rows whose
+        file can't be moved back are logged as move_back_failed, not retried.
+        Returns the hashes that actually made it into the table.
+        """
+        if not pending:
+            return set()
+        cfg = self.cfg
+
+        # Writes below go through the raw driver cursor, which SQLAlchemy doesn't see;
+        # make sure it has a transaction open so conn.commit() isn't a no-op.
+        if not conn.in_transaction():
+            conn.begin()
+
+        moved: List[Tuple[_PendingRow, Path]] = []
+        try:
+            self._flush_batch(conn, [p.insert_row() for p in pending], sessions.shifted_rows())
+
+            # Move files to Processed BEFORE commit (so failure rolls back)
+            for p in pending:
+                moved.append((p, safe_move_with_suffix(p.path, cfg.folders.processed_dir)))
+
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            stranded = set()
+            for p, dest in moved:
+                try:
+                    shutil.move(str(dest), str(p.path))
+                except Exception as e:
+                    # File sits in Processed with no row; say so instead of retrying from a missing path
+                    stranded.add(p.path)
+                    counts["error"] += 1
+                    p.event["status"] = "error"
+                    p.event["reason"] = f"move_back_failed:{type(e).__name__}:{dest}"
+                    log.write(p.event)
+            inserted = {
+                p.file_hash for p in pending
+                if p.path not in stranded and self._insert_one(conn, p, counts, log)
+            }
+            sessions.reload(conn)
+            return inserted
+
+        sessions.mark_flushed()
+        for p, _ in moved:
+            counts["inserted"] += 1
+            p.event["status"] = "inserted"
+            p.event["reason"] = "ok"
+            log.write(p.event)
+        return {p.file_hash for p in pending}
+
+    def _insert_one(self, conn, p: _PendingRow, counts: Dict[str, int], log: JsonlLogger) -> bool:
+        """
+        Slow path: one file, one transaction, session re-derived from the table.
+        Returns True if the row was inserted.
+        """
+        cfg = self.cfg
+        event = p.event
+
+        # Atomic: insert + move, else rollback and move to Needs Review
+        try:
+            session_id, session_start, session_index = ensure_session_and_index(
+                conn=conn,
+                site=p.parsed.site,
+                ts_local=p.parsed.tournament_start_ts_local,
+                gap_minutes=cfg.session_gap_minutes,
+            )
+
+            conn.execute(
+                text(q.SQL_INSERT_TOURNAMENT),
+                dict(zip(
+                    q.TOURNAMENT_PARAM_KEYS,
+                    _insert_row(p.parsed, p.path, p.file_hash, session_id, session_start, session_index),
+                )),
+            )
+
+            # Move file to Processed BEFORE commit (so failure rolls back)
+            safe_move_with_suffix(p.path, cfg.folders.processed_dir)
+
+            conn.commit()
+            counts["inserted"] += 1
+            event["status"] = "inserted"
+            event["reason"] = "ok"
+            log.write(event)
+            return True
+
+        except IntegrityError:
+            conn.rollback()
+            # Unique constraint conflict -> duplicate
+            try:
+                safe_move_with_suffix(p.path, cfg.folders.duplicate_dir)
+            except Exception:
+                # If the Duplicate move fails, we still log.
+                pass
+            counts["duplicate"] += 1
+            event["status"] = "duplicate"
+            event["reason"] = "unique_conflict"
+            log.write(event)
+            return False
+
+        except Exception as e:
+            conn.rollback()
+            # You required: rollback, then move to Needs Review with move_failed reason
+            try:
+                safe_move_with_suffix(p.path, cfg.folders.needs_review_dir)
+            except Exception:
+                # If even Needs Review move fails, we still log.
+                pass
+            counts["error"] += 1
+            event["status"] = "error"
+            event["reason"] = f"move_failed_or_db_error:{type(e).__name__}"
+            log.write(event)
+            return False
+
+    def _prescan(self, path: Path) -> Tuple[Optional[datetime], Path, Optional[str], Optional[ParsedTournament], Optional[str]]:
+        """
+        Returns (start_ts, path, file_hash, parsed, reason).
+        Runs on worker threads: no DB access, no shared state.
+        """
+        try:
+            data = path.read_bytes()
+            file_hash = sha256_bytes(data)
+            parsed, reason = self.parser.parse(self.cfg.site, data)
+        except Exception:
+            # Retried (and reported) in Phase 3
+            return None, path, None, None, None
+
+        # Unparseable files go last (still handled normally)
+        ts = parsed.tournament_start_ts_local if parsed else None
+        return ts, path, file_hash, parsed, reason
+
     def _list_input_files(self) -> List[Path]:
         cfg = self.cfg
         if not cfg.input_dir.exists():
@@ -91,180 +347,143 @@ class TournamentImporter:
         if not ext.startswith("."):
             ext = "." + ext
 
-        all_files = [p for p in cfg.input_dir.iterdir() if p.is_file()]
-        filtered = [p for p in all_files if p.suffix.lower() == ext]
+        # scandir reuses the dirent type, so no stat per entry (only symlinks get followed)
+        with os.scandir(cfg.input_dir) as it:
+            filtered = [
+                Path(e.path)
+                for e in it
+                if os.path.splitext(e.name)[1].lower() == ext and e.is_file()
+            ]
 
         # # Debug (remove after first successful run)
         # print("DEBUG expected ext:", repr(ext))
 
-        # Deterministic ordering by name (we'll still do start_time sorting later)
-        return sorted(filtered, key=lambda p: p.name.lower())
+        # Unordered; run() sorts by start time with the name as tie-breaker
+        return filtered
 
     def run(self) -> None:
         cfg = self.cfg
         ensure_dirs(cfg.folders)
 
-        inserted = 0
-        duplicates = 0
-        needs_review = 0
-        errors = 0
-        dry_runs = 0
+        counts = {"inserted": 0, "duplicate": 0, "needs_review": 0, "error": 0, "dry_run": 0}
 
         files = self._list_input_files()
 
-        # Phase 1: pre-parse timestamps for ordering
-        file_queue = []
+        # Phase 1: read, hash and parse each file once (in parallel); Phase 3 reuses the results.
+        # File reads and sha256 release the GIL, so threads overlap I/O with parsing.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            file_queue = list(pool.map(self._prescan, files))
+
+        # Phase 2: sort oldest → newest, None last, ties by name (deterministic)
+        file_queue.sort(key=lambda x: (x[0] is None, x[0], x[1].name.lower()))
+
+        # Phase 3: process in sorted order, one connection for the whole run.
+        # Sessions are assigned in memory; good rows are queued and written in
+        # batches by _commit_pending.
+        pending: List[_PendingRow] = []
+        queued_hashes: Set[str] = set()
+
+        with self.engine.connect() as conn, JsonlLogger(cfg.folders.log_path) as log:
+            # One round-trip for the duplicate pre-check; rows are added once they're committed
+            existing_hashes = self._existing_hashes(conn, [x[2] for x in file_queue if x[2] is not None])
+            sessions = SessionIndex(cfg.site, cfg.session_gap_minutes)
+            if not cfg.dry_run:
+                sessions.reload(conn)
+
+            for _, path, file_hash, parsed, reason in file_queue:
+                event: Dict[str, Any] = {
+                    "file_name": path.name,
+                    "file_hash": None,
+                    "status": None,   # inserted / duplicate / needs_review / error / dry_run
+                    "reason": None,
+                    "tournament_id": None,
+                    "start_time": None,
+                    "buy_in": None,
+                    "payout": None,
+                }
 
-        for path in files:
-            try:
-                text_content = read_text_with_fallback(path)
-                parsed, _ = self.parser.parse(self.cfg.site, text_content)
-                if parsed:
-                    file_queue.append((parsed.tournament_start_ts_local, path))
-                else:
-                    # Unparseable files go last (still handled normally)
-                    file_queue.append((None, path))
-            except Exception:
-                file_queue.append((None, path))
-
-        # Phase 2: sort oldest → newest, None last
-        file_queue.sort(key=lambda x: (x[0] is None, x[0]))
-
-        # Phase 3: process in sorted order
-        for _, path in file_queue:
-            event: Dict[str, Any] = {
-                "file_name": path.name,
-                "file_hash": None,
-                "status": None,   # inserted / duplicate / needs_review / error / dry_run
-                "reason": None,
-                "tournament_id": None,
-                "start_time": None,
-                "buy_in": None,
-                "payout": None,
-            }
-
-            try:
-                file_hash = sha256_file(path)
-                event["file_hash"] = file_hash
-
-                # Hash pre-check first (fast fail)
-                with self.engine.connect() as conn:
-                    if self._hash_exists(conn, file_hash):
+                try:
+                    if file_hash is None:
+                        # Phase 1 couldn't read or parse it; try again so the failure lands here
+                        data = path.read_bytes()
+                        file_hash = sha256_bytes(data)
+                        parsed, reason = self.parser.parse(cfg.site, data)
+                        if self._hash_exists(conn, file_hash):
+                            existing_hashes.add(file_hash)
+                    event["file_hash"] = file_hash
+
+                    if file_hash in queued_hashes:
+                        # Same content is waiting in the batch; flush it so the check below sees the outcome
+                        existing_hashes |= self._commit_pending(conn, pending, sessions, counts, log)
+                        pending.clear()
+                        queued_hashes.clear()
+
+                    # Hash pre-check first (fast fail)
+                    if file_hash in existing_hashes:
                         if not cfg.dry_run:
                             safe_move_with_suffix(path, cfg.folders.duplicate_dir)
                         event["status"] = "duplicate"
                         event["reason"] = "hash_exists"
-                        duplicates += 1
-                        log_jsonl(cfg.folders.log_path, event)
+                        counts["duplicate"] += 1
+                        log.write(event)
                         continue
 
-                # Parse
-                text_content = read_text_with_fallback(path)
-                parsed, reason = self.parser.parse(cfg.site, text_content)
-
-                if parsed is None:
-                    # Route to Needs Review (tickets or parse errors)
-                    if not cfg.dry_run:
-                        safe_move_with_suffix(path, cfg.folders.needs_review_dir)
-
-                    event["status"] = "needs_review" if (reason or "").startswith("needs_review") else "error"
-                    event["reason"] = reason or "unknown_parse_failure"
-                    if event["status"] == "needs_review":
-                        needs_review += 1
-                    else:
-                        errors += 1
-                    log_jsonl(cfg.folders.log_path, event)
-                    continue
+                    if parsed is None:
+                        # Route to Needs Review (tickets or parse errors)
+                        if not cfg.dry_run:
+                            safe_move_with_suffix(path, cfg.folders.needs_review_dir)
 
-                # Fill event fields
-                event["tournament_id"] = parsed.tournament_id
-                event["start_time"] = parsed.tournament_start_ts_local.isoformat(sep=" ")
-                event["buy_in"] = parsed.buy_in_amount
-                event["payout"] = parsed.payout_amount
-
-                if cfg.dry_run:
-                    dry_runs += 1
-                    event["status"] = "dry_run"
-                    event["reason"] = "no_db_no_move"
-                    log_jsonl(cfg.folders.log_path, event)
-                    continue
+                        event["status"] = "needs_review" if (reason or "").startswith("needs_review") else "error"
+                        event["reason"] = reason or "unknown_parse_failure"
+                        counts[event["status"]] += 1
+                        log.write(event)
+                        continue
 
-                # Atomic: insert + move, else rollback and move to Needs Review
-                with self.engine.connect() as conn:
-                    trans = conn.begin()
-                    try:
-                        session_id, session_start, session_index = ensure_session_and_index(
-                            conn=conn,
-                            site=parsed.site,
-                            ts_local=parsed.tournament_start_ts_local,
-                            gap_minutes=cfg.session_gap_minutes,
-                        )
-
-                        conn.execute(
-                            text(q.SQL_INSERT_TOURNAMENT),
-                            {
-                                "site": parsed.site,
-                                "tournament_id": parsed.tournament_id,
-                                "start_ts": parsed.tournament_start_ts_local,
-                                "hero_name": parsed.hero_name,
-                                "source_file_name": path.name,
-                                "source_file_hash": file_hash,
-                                "tournament_name": parsed.tournament_name,
-                                "game_type": parsed.game_type,
-                                "player_count": parsed.player_count,
-                                "currency": parsed.currency,
-                                "buy_in_amount": parsed.buy_in_amount,
-                                "prize_pool_amount": parsed.prize_pool_amount,
-                                "payout_amount": parsed.payout_amount,
-                                "profit_amount": parsed.profit_amount,
-                                "finish_place": parsed.finish_place,
-                                "session_id": session_id,
-                                "session_start_ts_local": session_start,
-                                "session_tournament_index": session_index,
-                            },
-                        )
-
-                        # Move file to Processed BEFORE commit (so failure rolls back)
-                        safe_move_with_suffix(path, cfg.folders.processed_dir)
-
-                        trans.commit()
-                        inserted += 1
-                        event["status"] = "inserted"
-                        event["reason"] = "ok"
-                        log_jsonl(cfg.folders.log_path, event)
-
-                    except IntegrityError:
-                        trans.rollback()
-                        # Unique constraint conflict -> duplicate
-                        safe_move_with_suffix(path, cfg.folders.duplicate_dir)
-                        duplicates += 1
-                        event["status"] = "duplicate"
-                        event["reason"] = "unique_conflict"
-                        log_jsonl(cfg.folders.log_path, event)
+                    # Fill event fields
+                    event["tournament_id"] = parsed.tournament_id
+                    event["start_time"] = parsed.tournament_start_ts_local.isoformat(sep=" ")
+                    event["buy_in"] = parsed.buy_in_amount
+                    event["payout"] = parsed.payout_amount
+
+                    if cfg.dry_run:
+                        counts["dry_run"] += 1
+                        event["status"] = "dry_run"
+                        event["reason"] = "no_db_no_move"
+                        log.write(event)
+                        continue
 
-                    except Exception as e:
-                        trans.rollback()
-                        # You required: rollback, then move to Needs Review with move_failed reason
-                        try:
+                except Exception as e:
+                    # Fatal per-file failure: log and push to Needs Review if possible
+                    try:
+                        if not cfg.dry_run:
                             safe_move_with_suffix(path, cfg.folders.needs_review_dir)
-                        except Exception:
-                            # If even Needs Review move fails, we still log.
-                            pass
-                        errors += 1
-                        event["status"] = "error"
-                        event["reason"] = f"move_failed_or_db_error:{type(e).__name__}"
-                        log_jsonl(cfg.folders.log_path, event)
-
-            except Exception as e:
-                # Fatal per-file failure: log and push to Needs Review if possible
-                try:
-                    if not cfg.dry_run:
-                        safe_move_with_suffix(path, cfg.folders.needs_review_dir)
-                except Exception:
-                    pass
-                errors += 1
-                event["status"] = "error"
-                event["reason"] = f"fatal:{type(e).__name__}"
-                log_jsonl(cfg.folders.log_path, event)
-
-        print(f"Dry Runs: {dry_runs} | Inserted: {inserted} | Duplicates: {duplicates} | Needs Review: {needs_review} | Errors: {errors}")
+                    except Exception:
+                        pass
+                    counts["error"] += 1
+                    event["status"] = "error"
+                    event["reason"] = f"fatal:{type(e).__name__}"
+                    log.write(event)
+                    continue
+
+                _, _, session_index, session_row = sessions.assign(parsed.tournament_start_ts_local)
+                pending.append(_PendingRow(
+                    path=path,
+                    event=event,
+                    parsed=parsed,
+                    file_hash=file_hash,
+                    session_index=session_index,
+                    session_row=session_row,
+                ))
+                queued_hashes.add(file_hash)
+
+                if len(pending) >= self.BATCH_SIZE:
+                    existing_hashes |= self._commit_pending(conn, pending, sessions, counts, log)
+                    pending.clear()
+                    queued_hashes.clear()
+
+            self._commit_pending(conn, pending, sessions, counts, log)
+
+        print(
+            f"Dry Runs: {counts['dry_run']} | Inserted: {counts['inserted']} | Duplicates: {counts['duplicate']} "
+            f"| Needs Review: {counts['needs_review']} | Errors: {counts['error']}"
+        )
@@ -1,9 +1,6 @@
-from pathlib import Path
-
-
-def read_text_with_fallback(path: Path) -> str:
+def decode_with_fallback(data: bytes) -> str:
     try:
-        return path.read_text(encoding="utf-8")
+        return data.decode("utf-8")
     except UnicodeDecodeError:
         # Windows fallback
-        return path.read_text(encoding="cp1252", errors="replace")
+        return data.decode("cp1252", errors="replace")